@@ -6,55 +6,201 @@ It includes:
 - A product recommendation agent for Beyorganik products.
 - A Python assistant for code-related queries.
 - A routing agent that decides which assistant should handle the user query.
+- A local semantic pre-router that skips the routing agent when the intent is clear.
 
 The product data comes from a MySQL database and is accessed through a token-safe tool.
 
 Author: @mguzelocak
 """
 
+import argparse
+import asyncio
+import hashlib
+
 from agents import Agent, Runner
+from diskcache import Cache
 from dotenv import load_dotenv
-from utils import get_all_product_titles_and_prices
+from semantic_router import Route
+from semantic_router.encoders import BaseEncoder
+from semantic_router.layer import RouteLayer
+from utils import EMBEDDING_MODEL, embed_texts, get_all_product_titles_and_prices, product_data_version
 
 # 🔐 Load environment variables from .env file
 load_dotenv()
 
+# 📌 Static instructions, kept as constants so every turn starts with the same
+# text; variable content (the query, tool output) always comes after them.
+PRODUCT_INSTRUCTIONS = (
+    "Sen cok iyi bir Beyorganik Gida urun tavsiyeleri yapan bir asistansin. "
+    "Ozellikle sadece sana verilen querye gore uygun urunleri tavsiye ediyorsun. "
+    "Bu tavsiye de sadece sana verilen tool da ki urunleri kaynak olarak kullaniyorsun. "
+    "Ve kesinlile tekrar soru sormuyorsun."
+)
+PYTHON_INSTRUCTIONS = "Sen cok iyi bir Python programlama dili asistanisin."
+ROUTING_INSTRUCTIONS = "Senin bir handoff asistanisin. Verilen querye gore uygun agenti secip ona yonlendiriyorsun."
+
 # 🛍️ Beyorganik product recommendation agent
 productAsistant = Agent(
     name="Beyorganik Gida Urun Tavsiyeleri Asistani",
-    instructions=(
-        "Sen cok iyi bir Beyorganik Gida urun tavsiyeleri yapan bir asistansin. "
-        "Ozellikle sadece sana verilen querye gore uygun urunleri tavsiye ediyorsun. "
-        "Bu tavsiye de sadece sana verilen tool da ki urunleri kaynak olarak kullaniyorsun. "
-        "Ve kesinlile tekrar soru sormuyorsun."
-    ),
+    instructions=PRODUCT_INSTRUCTIONS,
     tools=[get_all_product_titles_and_prices],
     model="gpt-4o",
-    handoff_description=(
-        "Senin bir Beyorganik Gida urun tavsiyeleri yapan bir asistansin. "
-        "Verilen querye gore uygun urunleri tavsiye ediyorsun."
-    )
+    handoff_description="Verilen querye gore uygun Beyorganik Gida urunlerini tavsiye eder."
 )
 
 # 🐍 Python coding assistant
 pythonAgent = Agent(
     name="Python Asistani",
-    instructions="Sen cok iyi bir Python programlama dili asistanisin.",
-    handoff_description=(
-        "Senin bir Python programlama dili asistanisin. "
-        "Verilen querye gore uygun python kodu yaziyorsun."
-    )
+    instructions=PYTHON_INSTRUCTIONS,
+    handoff_description="Verilen querye gore uygun Python kodu yazar."
 )
 
 # 🔁 Routing agent: decides which sub-agent should respond
 routingAgent = Agent(
     name="Routing Asistani",
-    instructions="Senin bir handoff asistanisin. Verilen querye gore uygun agenti secip ona yonlendiriyorsun.",
+    instructions=ROUTING_INSTRUCTIONS,
     handoffs=[productAsistant, pythonAgent],
 )
 
-# ▶️ Execute agent chain with a sample query
-response = Runner.run_sync(routingAgent, "saglikli yaz icecegi")
 
-# 🖨️ Print the result
-print(f"Instruction: {response.input}\n{response.final_output}")
\ No newline at end of file
+class SharedEmbeddingEncoder(BaseEncoder):
+    """
+    semantic-router encoder backed by the product search embedding model in `utils`,
+    so the pre-router and the product tool load a single model per process.
+    """
+
+    name: str = EMBEDDING_MODEL
+    type: str = "shared"
+    score_threshold: float = 0.5
+
+    def __call__(self, docs: list[str]) -> list[list[float]]:
+        return embed_texts(docs).tolist()
+
+
+# 🧭 Local semantic pre-router: picks the sub-agent without an LLM call
+productRoute = Route(
+    name="product",
+    utterances=[
+        "saglikli yaz icecegi",
+        "bagisiklik icin hangi urunu onerirsin",
+        "organik zencefil shot var mi",
+        "kahvaltilik organik urunler",
+        "glutensiz atistirmalik tavsiye et",
+        "cocuklar icin saglikli urun",
+        "en uygun fiyatli bal hangisi",
+        "sekersiz recel onerisi",
+    ],
+    score_threshold=0.5,
+)
+pythonRoute = Route(
+    name="python",
+    utterances=[
+        "python ile liste nasil siralanir",
+        "bu python kodundaki hatayi bul",
+        "pandas ile csv dosyasi okuma",
+        "python'da sozluk nasil kullanilir",
+        "bir fonksiyon yaz",
+        "for dongusu ornegi",
+        "python class ornegi ver",
+        "async await nasil calisir",
+    ],
+    score_threshold=0.5,
+)
+routeLayer = RouteLayer(
+    encoder=SharedEmbeddingEncoder(),
+    routes=[productRoute, pythonRoute],
+)
+routeAgents = {productRoute.name: productAsistant, pythonRoute.name: pythonAgent}
+
+
+def pick_agent(query: str) -> Agent:
+    """
+    Chooses the agent that should answer a query using the local pre-router.
+
+    Falls back to the LLM routing agent when no route clears its score threshold.
+
+    Args:
+        query (str): The user query.
+
+    Returns:
+        Agent: The sub-agent to run, or `routingAgent` when unsure.
+    """
+    return routeAgents.get(routeLayer(query).name, routingAgent)
+
+
+# 💾 Exact-match cache of final answers, shared across runs
+responseCache = Cache("data/processed/agent_cache")
+CACHE_TTL = 24 * 60 * 60  # seconds; bounds how long an answer can outlive a price change
+
+
+def agent_fingerprint(agent: Agent) -> str:
+    """
+    Hashes an agent's name, model and instructions together with those of its handoff targets.
+
+    Args:
+        agent (Agent): The agent to fingerprint.
+
+    Returns:
+        str: Hex digest that changes whenever any agent reachable by handoff changes.
+    """
+    digest = hashlib.sha256(f"{agent.name}|{agent.model}|{agent.instructions}".encode("utf-8"))
+    for target in agent.handoffs:
+        if isinstance(target, Agent):
+            digest.update(agent_fingerprint(target).encode("utf-8"))
+    return digest.hexdigest()
+
+
+async def run_cached(agent: Agent, query: str) -> str:
+    """
+    Runs an agent on a query, returning a stored answer for repeated queries.
+
+    The cache key includes a fingerprint of the agent and its handoff targets
+    and `product_data_version`, so editing instructions or syncing products
+    into MySQL (`insert_products_to_mysql`) invalidates earlier answers.
+    Entries also expire after `CACHE_TTL`.
+
+    Args:
+        agent (Agent): The agent to run.
+        query (str): The user query.
+
+    Returns:
+        str: The agent's final output.
+    """
+    key = (agent_fingerprint(agent), product_data_version(), query)
+
+    output = responseCache.get(key)
+    if output is None:
+        response = await Runner.run(agent, query)
+        output = str(response.final_output)
+        responseCache.set(key, output, expire=CACHE_TTL)
+    return output
+
+
+async def main(query: str, route: str = "auto"):
+    """
+    ▶️ Executes the agent chain for a query and prints the result.
+
+    Args:
+        query (str): The user query.
+        route (str): "auto" to use the local pre-router, or one of
+                     "product", "python", "routing" to pick the agent directly.
+    """
+    agents = {"product": productAsistant, "python": pythonAgent, "routing": routingAgent}
+    agent = pick_agent(query) if route == "auto" else agents[route]
+    output = await run_cached(agent, query)
+
+    # 🖨️ Print the result
+    print(f"Instruction: {query}\n{output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ask the Beyorganik agents a question.")
+    parser.add_argument("--query", default="saglikli yaz icecegi", help="The user query.")
+    parser.add_argument(
+        "--route",
+        choices=["auto", "product", "python", "routing"],
+        default="auto",
+        help="Agent to use; 'auto' lets the local pre-router decide.",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.query, args.route))
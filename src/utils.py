@@ -20,12 +20,25 @@ Author: @mguzelocak
 """
 
 from dotenv import load_dotenv
-from bs4 import BeautifulSoup
+from selectolax.parser import HTMLParser
+import asyncio
+import functools
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 import os
-import requests
-import json
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import aiohttp
+import ijson
+import orjson
 import mysql.connector
+from mysql.connector.pooling import MySQLConnectionPool
+import faiss
+import numpy as np
+from sentence_transformers import SentenceTransformer
 from agents import function_tool
+from typing import Iterator
 
 # 🌱 Load environment variables
 load_dotenv()
@@ -37,26 +50,193 @@ mysqlUser = os.getenv("MYSQL_USER")
 mysqlPassword = os.getenv("MYSQL_PASSWORD")
 mysqlDatabase = os.getenv("DB")
 
+# 🔁 Trendyol API retry policy
+MAX_RETRIES = 5
+RETRY_BACKOFF = 0.3
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# 🏷️ Trendyol product fields used downstream; everything else is skipped while parsing
+PRODUCT_FIELDS = {"barcode", "title", "description", "salePrice", "productUrl", "categoryName", "brand"}
+
+# 🔌 MySQL connection pool, created on first use
+_POOL = None
+
+# 🔎 Title embedding model and product search index, created on first use
+EMBEDDING_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+_EMBEDDER = None
+_EMBEDDER_LOCK = threading.Lock()
+_PRODUCT_INDEX = None
+_PRODUCT_INDEX_LOCK = threading.Lock()
+PRODUCT_INDEX_PATH = "data/processed/product_index.faiss"
+PRODUCT_BARCODES_PATH = "data/processed/product_index_barcodes.json"
+PRODUCT_VERSION_PATH = "data/processed/product_index.version"
+
+# 🧵 Worker threads for blocking tool work (MySQL, embeddings)
+_TOOL_EXECUTOR = ThreadPoolExecutor(max_workers=4)
+
+
+def get_connection():
+    """
+    Checks out a connection from the shared MySQL connection pool.
+
+    The pool is created lazily on the first call so importing this module
+    never contacts the database. Closing the returned connection hands it
+    back to the pool.
+
+    Returns:
+        PooledMySQLConnection: A connection from the pool.
+    """
+    global _POOL
+    if _POOL is None:
+        _POOL = MySQLConnectionPool(
+            pool_name="beyorganik",
+            pool_size=8,
+            host=mysqlHost,
+            user=mysqlUser,
+            password=mysqlPassword,
+            database=mysqlDatabase
+        )
+    return _POOL.get_connection()
+
 
 def clean_html(html_content: str) -> str:
     """
     Strips HTML tags from a given string.
 
+    Descriptions without any markup or entities are returned as-is, so no
+    parse tree is built for plain-text content.
+
     Args:
         html_content (str): Raw HTML content.
 
     Returns:
         str: Cleaned plain text content.
     """
-    if html_content:
-        return BeautifulSoup(html_content, "html.parser").get_text(separator="\n").strip()
-    return ""
+    if not html_content:
+        return ""
+    if "<" not in html_content and "&" not in html_content:
+        return html_content.strip()
+    return HTMLParser(html_content).text(separator="\n").strip()
 
 
-def get_product() -> dict[str, dict]:
+def _add_products(product_map: dict[str, dict], data: dict) -> None:
+    """
+    Adds the products of a single Trendyol API page to the product map.
+
+    Args:
+        product_map (dict[str, dict]): Barcode-keyed product dictionary to fill.
+        data (dict): Decoded JSON body of one product page.
+    """
+    for product in data.get("content", []):
+        barcode = product.get("barcode")
+        if not barcode:
+            continue
+
+        product_map[barcode] = {
+            "title": product.get("title"),
+            "description": clean_html(product.get("description", "")),
+            "price": product.get("salePrice"),  # Consider also: listPrice, discountedPrice
+            "productUrl": product.get("productUrl"),
+            "category": product.get("categoryName"),
+            "brand": product.get("brand")
+        }
+
+
+async def _parse_page(stream: aiohttp.StreamReader) -> dict:
+    """
+    Incrementally parses a Trendyol product page, keeping only `PRODUCT_FIELDS`.
+
+    Images, attributes and other unused values are never materialized.
+
+    Args:
+        stream (aiohttp.StreamReader): Response body stream.
+
+    Returns:
+        dict: {"totalPages": int, "content": [product, ...]} with trimmed products.
+    """
+    page = {"content": []}
+    async for prefix, event, value in ijson.parse_async(stream, use_float=True):
+        field = prefix.removeprefix("content.item.")
+        if prefix == "totalPages":
+            page["totalPages"] = value
+        elif prefix == "content.item" and event == "start_map":
+            page["content"].append({})
+        elif field != prefix and field in PRODUCT_FIELDS:
+            page["content"][-1][field] = value
+    return page
+
+
+def _retry_after_seconds(header: str | None) -> float | None:
+    """
+    Parses a `Retry-After` header given either in seconds or as an HTTP date.
+
+    Args:
+        header (str | None): Raw header value.
+
+    Returns:
+        float | None: Seconds to wait, or None if the header is missing or invalid.
+    """
+    if not header:
+        return None
+    try:
+        return max(0.0, float(header))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+async def _fetch_page(session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                      base_url: str, page_num: int) -> dict:
+    """
+    Fetches a single product page from the Trendyol API.
+
+    Rate-limit and transient server errors (429, 5xx), connection errors
+    and timeouts are retried up to `MAX_RETRIES` times with exponential
+    backoff, or after the delay given by a `Retry-After` header.
+
+    Args:
+        session (aiohttp.ClientSession): Shared HTTP session.
+        semaphore (asyncio.Semaphore): Limits the number of in-flight requests.
+        base_url (str): Supplier products endpoint.
+        page_num (int): Zero-based page index.
+
+    Returns:
+        dict: Parsed page, see `_parse_page`.
+    """
+    url = f"{base_url}?page={page_num}&onSale=true"
+    for attempt in range(MAX_RETRIES + 1):
+        delay = RETRY_BACKOFF * 2 ** attempt
+        try:
+            async with semaphore:
+                async with session.get(url) as response:
+                    if response.status not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                        response.raise_for_status()
+                        return await _parse_page(response.content)
+                    retry_after = _retry_after_seconds(response.headers.get("Retry-After"))
+                    if retry_after is not None:
+                        delay = retry_after
+
+        except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError):
+            if attempt == MAX_RETRIES:
+                raise
+
+        await asyncio.sleep(delay)
+
+
+async def get_product_async() -> dict[str, dict]:
     """
     Fetches all product data from the Trendyol API for the given supplier ID.
 
+    The first page is requested on its own to learn `totalPages`; the remaining
+    pages are then fetched concurrently (at most 8 requests in flight). If any
+    page fails, the other pending requests are cancelled.
+
     Returns:
         dict[str, dict]: A dictionary where each key is a product barcode,
                          and the value is a dictionary containing product details.
@@ -64,53 +244,98 @@ def get_product() -> dict[str, dict]:
     product_map = {}
     headers = {"Authorization": f"{TRENDYOL_AUTH}"}
     base_url = f"https://apigw.trendyol.com/integration/product/sellers/{SUPLIER_ID}/products"
-    page_num = 0
+    semaphore = asyncio.Semaphore(8)
+    connector = aiohttp.TCPConnector(limit=16)
+    timeout = aiohttp.ClientTimeout(total=10)
+
+    try:
+        async with aiohttp.ClientSession(headers=headers, connector=connector, timeout=timeout) as session:
+            first_page = await _fetch_page(session, semaphore, base_url, 0)
+            total_pages = first_page.get("totalPages", 0)
+
+            tasks = [
+                asyncio.create_task(_fetch_page(session, semaphore, base_url, page_num))
+                for page_num in range(1, total_pages)
+            ]
+            try:
+                pages = await asyncio.gather(*tasks)
+            except BaseException:
+                # Stop the remaining pages before the session closes
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+
+    except aiohttp.ClientResponseError as e:
+        print(f"❌ Request failed with status code: {e.status}")
+        return {}
+
+    except (aiohttp.ClientError, asyncio.TimeoutError, ijson.JSONError) as e:
+        print(f"❌ Request exception occurred: {e}")
+        return {}
+
+    for data in [first_page, *pages]:
+        _add_products(product_map, data)
 
-    while True:
-        try:
-            url = f"{base_url}?page={page_num}&onSale=true"
-            response = requests.get(url, headers=headers)
+    return product_map
 
-            if response.status_code != 200:
-                print(f"❌ Request failed with status code: {response.status_code}")
-                return {}
 
-            data = response.json()
+def get_product() -> dict[str, dict]:
+    """
+    Synchronous entry point for `get_product_async`.
 
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Request exception occurred: {e}")
-            return {}
+    Uses `asyncio.run`, so it cannot be called while an event loop is already
+    running (e.g. in Jupyter notebooks); there, use
+    `await get_product_async()` instead.
 
-        for product in data.get("content", []):
-            barcode = product.get("barcode")
-            if not barcode:
-                continue
+    Returns:
+        dict[str, dict]: A dictionary where each key is a product barcode,
+                         and the value is a dictionary containing product details.
+    """
+    return asyncio.run(get_product_async())
 
-            product_map[barcode] = {
-                "title": product.get("title"),
-                "description": clean_html(product.get("description", "")),
-                "price": product.get("salePrice"),  # Consider also: listPrice, discountedPrice
-                "productUrl": product.get("productUrl"),
-                "category": product.get("categoryName"),
-                "brand": product.get("brand")
-            }
 
-        if page_num >= data.get("totalPages", 0) - 1:
-            break
-        page_num += 1
+def save_products_to_json(products: dict[str, dict], filename: str = "data/external/products.json"):
+    """
+    Saves product data to a local JSON file as indented UTF-8.
+
+    Args:
+        products (dict[str, dict]): Product dictionary as returned by `get_product`.
+        filename (str): Destination path of the JSON file.
+    """
+    with open(filename, "wb") as f:
+        f.write(orjson.dumps(products, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    print(f"💾 Saved {len(products)} products to {filename}")
+
+
+@functools.lru_cache(maxsize=4)
+def _load_products_cached(filename: str, mtime: float) -> dict[str, dict]:
+    """
+    Parses a products JSON file; cached per (filename, modification time).
+
+    Args:
+        filename (str): Path to the JSON file.
+        mtime (float): File modification time, used only as part of the cache key.
+
+    Returns:
+        dict[str, dict]: Product dictionary loaded from JSON.
+    """
+    with open(filename, "rb") as f:
+        return orjson.loads(f.read())
 
-    return product_map
 
 def load_products_from_json() -> dict[str, dict]:
     """
     Loads products from a local JSON file for use with AI agents.
 
+    The parsed file is cached until its modification time changes, so
+    repeated calls return the same (shared) dictionary without re-reading it.
+
     Returns:
         dict[str, dict]: Product dictionary loaded from JSON.
     """
     filename = "data/external/products.json"
-    with open(filename, "r", encoding="utf-8") as f:
-        products = json.load(f)
+    products = _load_products_cached(filename, os.path.getmtime(filename))
     print(f"📦 Loaded {len(products)} products from {filename}")
     return products
 
@@ -129,90 +354,440 @@ def get_product_by_barcode(barcode: str) -> dict:
     return products.get(barcode, {})
 
 
-def insert_products_to_mysql():
+def _product_row(barcode: str, product: dict) -> tuple:
+    """
+    Builds a 'products' table row from a product dictionary.
+
+    Missing (None) text fields become "" and a missing price becomes 0.0.
+
+    Args:
+        barcode (str): The product's barcode.
+        product (dict): Product metadata as stored in products.json.
+
+    Returns:
+        tuple: Values in (barcode, title, description, price, productUrl, category, brand) order.
+    """
+    return (
+        barcode,
+        (product.get("title") or "")[:65535],
+        (product.get("description") or "")[:65535],
+        float(product.get("price") or 0.0),
+        (product.get("productUrl") or "")[:65535],
+        (product.get("category") or "")[:65535],
+        (product.get("brand") or "")[:65535],
+    )
+
+
+def _has_unique_barcode_key(cursor) -> bool:
+    """
+    Checks whether 'products' has a primary key or unique index on `barcode` alone.
+
+    Args:
+        cursor: Open cursor on the products database.
+
+    Returns:
+        bool: True if duplicate barcodes are rejected by the table.
+    """
+    cursor.execute("""
+        SELECT 1
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'products' AND NON_UNIQUE = 0
+        GROUP BY INDEX_NAME
+        HAVING COUNT(*) = 1 AND MAX(COLUMN_NAME) = 'barcode'
+    """)
+    return bool(cursor.fetchall())
+
+
+def add_barcode_primary_key():
+    """
+    One-time migration that makes `barcode` a unique key of 'products'.
+
+    `barcode` becomes the primary key; if the table already has one (e.g. a
+    surrogate `id`), a `uq_products_barcode` unique index is added instead.
+    The upsert in `insert_products_to_mysql` relies on either key to detect
+    existing products inside the storage engine. Running it again is a no-op.
     """
-    Inserts new products into the MySQL 'products' table
-    only if the product barcode does not already exist.
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            if _has_unique_barcode_key(cursor):
+                print("ℹ️ products.barcode is already unique")
+                return
+
+            cursor.execute("""
+                SELECT 1
+                FROM information_schema.STATISTICS
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'products' AND INDEX_NAME = 'PRIMARY'
+                LIMIT 1
+            """)
+            if cursor.fetchall():
+                cursor.execute("ALTER TABLE products ADD UNIQUE KEY uq_products_barcode (barcode)")
+                print("✅ Added unique key uq_products_barcode on products.barcode")
+            else:
+                cursor.execute("ALTER TABLE products ADD PRIMARY KEY (barcode)")
+                print("✅ Added primary key on products.barcode")
+    finally:
+        conn.close()
+
+
+def _escape_tsv_field(value) -> str:
     """
-    json_path = "data/external/products.json"
+    Escapes a value for MySQL's default `LOAD DATA` TSV format.
+
+    Args:
+        value: Field value; None becomes MySQL's NULL marker.
 
-    conn = mysql.connector.connect(
-        host=mysqlHost,
-        user=mysqlUser,
-        password=mysqlPassword,
-        database=mysqlDatabase
+    Returns:
+        str: The escaped field.
+    """
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+        .replace("\0", "\\0")
     )
-    cursor = conn.cursor()
 
-    with open(json_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
 
-    inserted = 0
-    skipped = 0
+def _load_rows_with_infile(rows: list[tuple]) -> int:
+    """
+    Bulk-loads product rows through a temporary TSV file and `LOAD DATA LOCAL INFILE`.
+
+    Much faster than `executemany` for a cold load into an empty table. Uses
+    its own connection that may only send files from the temp directory, so
+    the shared pool never allows local file uploads.
+
+    Args:
+        rows (list[tuple]): Rows in 'products' column order.
+
+    Returns:
+        int: Number of rows loaded.
+
+    Raises:
+        mysql.connector.Error: If the server rejects the load (e.g. `local_infile` is OFF).
+    """
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", newline="", suffix=".tsv", delete=False) as f:
+        for row in rows:
+            f.write("\t".join(_escape_tsv_field(value) for value in row) + "\n")
+        tsv_path = f.name
+
+    try:
+        conn = mysql.connector.connect(
+            host=mysqlHost,
+            user=mysqlUser,
+            password=mysqlPassword,
+            database=mysqlDatabase,
+            allow_local_infile_in_path=tempfile.gettempdir()
+        )
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    LOAD DATA LOCAL INFILE %s INTO TABLE products
+                    CHARACTER SET utf8mb4
+                    FIELDS TERMINATED BY '\\t'
+                    LINES TERMINATED BY '\\n'
+                    (barcode, title, description, price, productUrl, category, brand)
+                """, (tsv_path,))
+                loaded = cursor.rowcount
+            conn.commit()
+            return loaded
+
+        except mysql.connector.Error:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+    finally:
+        os.remove(tsv_path)
+
+
+def _upsert_rows(cursor, rows: list[tuple], batch_size: int) -> int:
+    """
+    Writes product rows with `INSERT ... ON DUPLICATE KEY UPDATE` in batches.
+
+    Args:
+        cursor: Open cursor; the caller commits.
+        rows (list[tuple]): Rows in 'products' column order.
+        batch_size (int): Number of rows sent per `executemany` call.
+
+    Returns:
+        int: Total affected rows reported by MySQL.
+    """
+    affected = 0
+    for start in range(0, len(rows), batch_size):
+        cursor.executemany("""
+            INSERT INTO products (barcode, title, description, price, productUrl, category, brand)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                title = VALUES(title),
+                description = VALUES(description),
+                price = VALUES(price),
+                productUrl = VALUES(productUrl),
+                category = VALUES(category),
+                brand = VALUES(brand)
+        """, rows[start:start + batch_size])
+        affected += cursor.rowcount
+    return affected
+
+
+def insert_products_to_mysql(batch_size: int = 1000):
+    """
+    Inserts products into the MySQL 'products' table, updating the
+    details of products whose barcode already exists.
+
+    Rows are written with `INSERT ... ON DUPLICATE KEY UPDATE` through
+    `executemany` in batches and committed as one transaction. Requires
+    `barcode` to be a primary or unique key (see `add_barcode_primary_key`);
+    without it nothing is written, since every sync would duplicate all rows.
+    When the table is empty, all rows are bulk-loaded with
+    `LOAD DATA LOCAL INFILE` instead, falling back to `executemany` if the
+    server does not allow it.
 
+    Args:
+        batch_size (int): Number of rows sent per `executemany` call.
+    """
+    data = load_products_from_json()
+    rows = []
     for barcode, product in data.items():
         try:
-            # Skip if product already exists
-            cursor.execute("SELECT 1 FROM products WHERE barcode = %s LIMIT 1", (barcode,))
-            if cursor.fetchone():
-                skipped += 1
-                continue
+            rows.append(_product_row(barcode, product))
+        except (TypeError, ValueError) as e:
+            print(f"❌ Skipping barcode {barcode}: {e}")
 
-            # Insert new product
-            cursor.execute("""
-                INSERT INTO products (barcode, title, description, price, productUrl, category, brand)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """, (
-                barcode,
-                product.get("title", "")[:65535],
-                product.get("description", "")[:65535],
-                float(product.get("price", 0.0)),
-                product.get("productUrl", "")[:65535],
-                product.get("category", "")[:65535],
-                product.get("brand", "")[:65535],
-            ))
-            inserted += 1
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            if not _has_unique_barcode_key(cursor):
+                print("❌ products.barcode is not a primary/unique key; run add_barcode_primary_key() first")
+                return
 
-        except Exception as e:
-            print(f"❌ Error inserting barcode {barcode}: {e}")
+            cursor.execute("SELECT EXISTS(SELECT 1 FROM products)")
+            is_empty = not cursor.fetchone()[0]
 
-    conn.commit()
-    cursor.close()
-    conn.close()
+            affected = None
+            if is_empty:
+                try:
+                    affected = _load_rows_with_infile(rows)
+                except mysql.connector.Error as e:
+                    print(f"⚠️ LOAD DATA LOCAL INFILE failed ({e}); falling back to executemany")
 
-    print(f"✅ Inserted: {inserted} | Skipped (exists): {skipped}")
+            if affected is None:
+                try:
+                    affected = _upsert_rows(cursor, rows, batch_size)
+                    conn.commit()
 
+                except mysql.connector.Error as e:
+                    conn.rollback()
+                    print(f"❌ Error inserting products: {e}")
+                    return
+    finally:
+        conn.close()
 
-@function_tool
-def get_all_product_titles_and_prices() -> list[dict]:
+    reset_product_index()
+
+    print(f"✅ Upserted: {len(rows)} | Rows affected: {affected}")
+
+
+def iter_product_titles_and_prices() -> Iterator[dict]:
+    """
+    Streams product barcodes, titles and prices from the MySQL 'products' table.
+
+    Rows are read through an unbuffered cursor and yielded one at a time, so
+    callers can build whatever output they need without an intermediate copy.
+
+    Yields:
+        dict: A product record such as {"barcode": "869...", "title": "Product A", "price": 499.9}.
     """
-    Retrieves all product titles and prices from the MySQL 'products' table.
+    conn = get_connection()
+    try:
+        with conn.cursor(dictionary=True, buffered=False) as cursor:
+            cursor.execute("SELECT barcode, title, price FROM products")
+            yield from cursor
+    finally:
+        conn.close()
 
-    This function connects to the database using credentials provided via environment variables,
-    queries all entries in the 'products' table, and returns a list of dictionaries, each containing:
-    - title: The name of the product
-    - price: The product's price in Turkish Lira (₺)
+
+def _get_embedder() -> SentenceTransformer:
+    """
+    Returns the shared sentence embedding model, loading it on first use.
 
     Returns:
-        list[dict]: A list of product records in the format:
-        [
-            {"title": "Product A", "price": 499.9},
-            {"title": "Product B", "price": 349.0},
-            ...
-        ]
+        SentenceTransformer: The multilingual title embedding model.
     """
-    conn = mysql.connector.connect(
-        host=mysqlHost,
-        user=mysqlUser,
-        password=mysqlPassword,
-        database=mysqlDatabase
-    )
-    cursor = conn.cursor(dictionary=True)
+    global _EMBEDDER
+    with _EMBEDDER_LOCK:
+        if _EMBEDDER is None:
+            _EMBEDDER = SentenceTransformer(EMBEDDING_MODEL)
+    return _EMBEDDER
+
+
+def embed_texts(texts: list[str]) -> np.ndarray:
+    """
+    Encodes texts into L2-normalized float32 vectors (inner product = cosine).
+
+    Args:
+        texts (list[str]): Texts to encode.
+
+    Returns:
+        np.ndarray: Array of shape (len(texts), dim).
+    """
+    vectors = _get_embedder().encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+    return vectors.astype(np.float32)
 
-    cursor.execute("SELECT title, price FROM products")
-    results = cursor.fetchall()
 
-    cursor.close()
-    conn.close()
+def reset_product_index():
+    """
+    Drops the product search index, in memory and on disk, so it is rebuilt on the next search,
+    and bumps `product_data_version`.
+    """
+    global _PRODUCT_INDEX
+    with _PRODUCT_INDEX_LOCK:
+        _PRODUCT_INDEX = None
+        for path in (PRODUCT_INDEX_PATH, PRODUCT_BARCODES_PATH):
+            if os.path.exists(path):
+                os.remove(path)
+        with open(PRODUCT_VERSION_PATH, "a"):
+            os.utime(PRODUCT_VERSION_PATH)
+
+
+def product_data_version() -> int:
+    """
+    Returns a version stamp of the product data, bumped by every `reset_product_index`.
+
+    Returns:
+        int: Modification time (ns) of the version file, or 0 before the first sync.
+    """
+    try:
+        return os.stat(PRODUCT_VERSION_PATH).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _build_product_index() -> tuple[faiss.IndexFlatIP, list[str]]:
+    """
+    Embeds every product title from MySQL and saves the index and barcodes to disk.
+
+    Returns:
+        tuple[faiss.IndexFlatIP, list[str]]: The index and the product barcodes.
+    """
+    products = list(iter_product_titles_and_prices())
+    barcodes = [product["barcode"] for product in products]
+    index = faiss.IndexFlatIP(_get_embedder().get_sentence_embedding_dimension())
+    if products:
+        index.add(embed_texts([product["title"] or "" for product in products]))
+
+    faiss.write_index(index, PRODUCT_INDEX_PATH)
+    with open(PRODUCT_BARCODES_PATH, "wb") as f:
+        f.write(orjson.dumps(barcodes))
+    return index, barcodes
+
+
+def _get_product_index() -> tuple[faiss.IndexFlatIP, list[str]]:
+    """
+    Returns the product title search index.
+
+    The index is loaded from `data/processed/` when present, so titles are only
+    re-embedded after `reset_product_index`, which only `insert_products_to_mysql`
+    calls. Products added or renamed in MySQL any other way are not picked up
+    until the index is reset; prices are always read fresh by `search_products`.
+
+    Returns:
+        tuple[faiss.IndexFlatIP, list[str]]: The index and the product barcodes,
+        where barcode `i` belongs to vector `i`.
+    """
+    global _PRODUCT_INDEX
+    with _PRODUCT_INDEX_LOCK:
+        if _PRODUCT_INDEX is None:
+            if os.path.exists(PRODUCT_INDEX_PATH) and os.path.exists(PRODUCT_BARCODES_PATH):
+                with open(PRODUCT_BARCODES_PATH, "rb") as f:
+                    _PRODUCT_INDEX = (faiss.read_index(PRODUCT_INDEX_PATH), orjson.loads(f.read()))
+            else:
+                _PRODUCT_INDEX = _build_product_index()
+        return _PRODUCT_INDEX
+
+
+def search_products(query: str, limit: int = 20) -> list[dict]:
+    """
+    Finds the products whose titles are semantically closest to a query.
+
+    The index only yields barcodes; titles and prices of the matches are then
+    read from MySQL, so prices are always current.
+
+    Args:
+        query (str): Free-text search query.
+        limit (int): Maximum number of products to return.
+
+    Returns:
+        list[dict]: Up to `limit` records with "title" and "price", best match first.
+    """
+    index, barcodes = _get_product_index()
+    if not barcodes:
+        return []
+
+    _, ids = index.search(embed_texts([query]), min(limit, len(barcodes)))
+    ranked = [barcodes[i] for i in ids[0] if i != -1]
+    if not ranked:
+        return []
+
+    conn = get_connection()
+    try:
+        with conn.cursor(dictionary=True) as cursor:
+            placeholders = ", ".join(["%s"] * len(ranked))
+            cursor.execute(
+                f"SELECT barcode, title, price FROM products WHERE barcode IN ({placeholders})",
+                ranked,
+            )
+            found = {row["barcode"]: row for row in cursor.fetchall()}
+    finally:
+        conn.close()
+
+    return [
+        {"title": found[barcode]["title"], "price": found[barcode]["price"]}
+        for barcode in ranked
+        if barcode in found
+    ]
+
+
+def _search_products_columns(query: str) -> dict[str, list]:
+    """
+    Runs `search_products` and transposes the matches into parallel lists.
+
+    Args:
+        query (str): Free-text search query.
+
+    Returns:
+        dict[str, list]: {"titles": [...], "prices": [...]}, best match first.
+    """
+    products = search_products(query)
+    return {
+        "titles": [product["title"] for product in products],
+        "prices": [float(product["price"] or 0.0) for product in products],
+    }
+
+
+@function_tool
+async def get_all_product_titles_and_prices(query: str) -> dict[str, list]:
+    """
+    Retrieves the titles and prices of the products most relevant to a query.
 
-    return results
\ No newline at end of file
+    Instead of returning the whole 'products' table, this tool runs a semantic
+    search over product titles and returns only the 20 best matches as two
+    parallel lists, so `prices[i]` is the price of `titles[i]`:
+    - titles: The names of the products, best match first
+    - prices: The products' prices in Turkish Lira (₺)
+
+    Args:
+        query: What the user is looking for, e.g. "saglikli yaz icecegi".
+
+    Returns:
+        dict[str, list]: The matching products in the format:
+        {
+            "titles": ["Product A", "Product B", ...],
+            "prices": [499.9, 349.0, ...]
+        }
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_TOOL_EXECUTOR, _search_products_columns, query)
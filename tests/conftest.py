@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Make `src/` importable the same way `python src/basic.py` sees it
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
@@ -0,0 +1,221 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import aiohttp
+import orjson
+import pytest
+
+import utils
+from utils import _add_products, _escape_tsv_field, _fetch_page, _parse_page, _retry_after_seconds
+
+
+class FakeStream:
+    """Minimal async byte stream, like aiohttp's `response.content`."""
+
+    def __init__(self, data: bytes, chunk_size: int = 7):
+        self._data = data
+        self._chunk_size = chunk_size
+
+    async def read(self, n: int = -1) -> bytes:
+        size = self._chunk_size if n < 0 else min(n, self._chunk_size)
+        chunk, self._data = self._data[:size], self._data[size:]
+        return chunk
+
+
+def parse(page: dict) -> dict:
+    return asyncio.run(_parse_page(FakeStream(orjson.dumps(page))))
+
+
+def test_parse_page_keeps_only_product_fields():
+    page = parse({
+        "totalPages": 3,
+        "content": [{
+            "barcode": "869001",
+            "title": "Organik Ginger Shot",
+            "salePrice": 49.9,
+            "images": [{"url": "https://cdn/x.jpg"}],
+            "attributes": [{"attributeName": "Hacim", "attributeValue": "60 ml"}],
+        }],
+    })
+
+    assert page == {
+        "totalPages": 3,
+        "content": [{"barcode": "869001", "title": "Organik Ginger Shot", "salePrice": 49.9}],
+    }
+
+
+def test_parse_page_ignores_nested_keys_named_like_product_fields():
+    page = parse({
+        "content": [{
+            "barcode": "869001",
+            "attributes": [{"title": "nested title", "barcode": "nested"}],
+            "seller": {"brand": "nested brand", "salePrice": 1.0},
+        }],
+        "meta": {"totalPages": 99},
+    })
+
+    assert page == {"content": [{"barcode": "869001"}]}
+
+
+def test_parse_page_keeps_products_separate():
+    page = parse({"content": [{"barcode": "a", "title": "A"}, {"barcode": "b"}]})
+
+    assert page["content"] == [{"barcode": "a", "title": "A"}, {"barcode": "b"}]
+
+
+def test_missing_product_field_becomes_none():
+    product_map = {}
+    _add_products(product_map, parse({"content": [{"barcode": "869001", "title": "Bal"}]}))
+
+    assert product_map["869001"]["title"] == "Bal"
+    assert product_map["869001"]["price"] is None
+    assert product_map["869001"]["brand"] is None
+    assert product_map["869001"]["description"] == ""
+
+
+MYSQL_UNESCAPES = {"t": "\t", "n": "\n", "r": "\r", "0": "\0", "\\": "\\"}
+
+
+def mysql_load_data_field(field: str):
+    """Decodes one field the way MySQL's default `LOAD DATA` format does."""
+    if field == "\\N":
+        return None
+    chars, i = [], 0
+    while i < len(field):
+        if field[i] == "\\":
+            chars.append(MYSQL_UNESCAPES[field[i + 1]])
+            i += 2
+        else:
+            chars.append(field[i])
+            i += 1
+    return "".join(chars)
+
+
+def test_escape_tsv_field_round_trips_special_characters():
+    row = ("869\t001", "Bal\nSuzme", "C:\\yol\\dosya", "satir\r\nsonu", "nul\0byte", None, "")
+    line = "\t".join(_escape_tsv_field(value) for value in row) + "\n"
+
+    # Only the separators and the terminator may remain as raw tabs/newlines
+    assert line.count("\t") == len(row) - 1
+    assert line.count("\n") == 1
+    assert tuple(mysql_load_data_field(field) for field in line[:-1].split("\t")) == row
+
+
+def test_escape_tsv_field_keeps_none_distinct_from_literal_n():
+    assert _escape_tsv_field(None) == "\\N"
+    assert mysql_load_data_field(_escape_tsv_field("\\N")) == "\\N"
+    assert mysql_load_data_field(_escape_tsv_field("N")) == "N"
+
+
+def test_escape_tsv_field_formats_numbers():
+    assert _escape_tsv_field(49.9) == "49.9"
+
+
+def test_retry_after_seconds_parses_delta_seconds():
+    assert _retry_after_seconds("3") == 3.0
+
+
+def test_retry_after_seconds_parses_http_date():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+
+    assert 25 <= _retry_after_seconds(format_datetime(retry_at, usegmt=True)) <= 30
+
+
+def test_retry_after_seconds_past_date_is_zero():
+    assert _retry_after_seconds("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+@pytest.mark.parametrize("header", [None, "", "soon", "-"])
+def test_retry_after_seconds_rejects_missing_or_garbage(header):
+    assert _retry_after_seconds(header) is None
+
+
+class FakeResponse:
+    def __init__(self, status: int, body: dict | None = None, headers: dict | None = None):
+        self.status = status
+        self.headers = headers or {}
+        self.content = FakeStream(orjson.dumps(body or {}))
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise aiohttp.ClientResponseError(None, (), status=self.status)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class FakeSession:
+    """Replays a scripted sequence of responses or exceptions for `session.get`."""
+
+    def __init__(self, outcomes: list):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def get(self, url: str):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def fetch(session: FakeSession, monkeypatch) -> tuple[dict, list[float]]:
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(utils.asyncio, "sleep", fake_sleep)
+
+    async def run():
+        return await _fetch_page(session, asyncio.Semaphore(1), "https://example", 0)
+
+    return asyncio.run(run()), delays
+
+
+def test_fetch_page_retries_status_and_honours_retry_after(monkeypatch):
+    session = FakeSession([
+        FakeResponse(429, headers={"Retry-After": "7"}),
+        FakeResponse(503),
+        FakeResponse(200, {"totalPages": 1, "content": [{"barcode": "a"}]}),
+    ])
+
+    page, delays = fetch(session, monkeypatch)
+
+    assert page == {"totalPages": 1, "content": [{"barcode": "a"}]}
+    assert delays == [7.0, utils.RETRY_BACKOFF * 2]
+
+
+def test_fetch_page_retries_connection_errors_and_timeouts(monkeypatch):
+    session = FakeSession([
+        aiohttp.ClientConnectionError("reset"),
+        asyncio.TimeoutError(),
+        FakeResponse(200, {"content": []}),
+    ])
+
+    page, _ = fetch(session, monkeypatch)
+
+    assert page == {"content": []}
+    assert session.calls == 3
+
+
+def test_fetch_page_reraises_after_last_attempt(monkeypatch):
+    monkeypatch.setattr(utils, "MAX_RETRIES", 2)
+    session = FakeSession([aiohttp.ClientConnectionError("reset")] * 3)
+
+    with pytest.raises(aiohttp.ClientConnectionError):
+        fetch(session, monkeypatch)
+    assert session.calls == 3
+
+
+def test_fetch_page_raises_status_after_last_attempt(monkeypatch):
+    monkeypatch.setattr(utils, "MAX_RETRIES", 1)
+    session = FakeSession([FakeResponse(503), FakeResponse(503)])
+
+    with pytest.raises(aiohttp.ClientResponseError) as excinfo:
+        fetch(session, monkeypatch)
+    assert excinfo.value.status == 503